@@ -2,7 +2,7 @@ from rich import traceback
 import logging
 import yaml
 
-from midi.connectors import Midi, PortManager
+from midi.connectors import Midi, PortManager, PortMonitor
 from midi.project import Project
 from time import sleep
 
@@ -21,8 +21,11 @@ port_manager.debug_ports()
 
 midi = Midi(port_manager)
 project = Project(project, port_manager, midi)
+port_monitor = PortMonitor(port_manager)
 
 midi.start()
+port_monitor.start()
+project._generator.start()
 project._clock.start()
 project._clock.toggle()
 
@@ -31,6 +34,11 @@ input("Press Enter to continue...")
 project._clock.stop()
 project._clock.join()
 
+port_monitor.stop()
+port_monitor.join()
+project._generator.stop()
+project._generator.join()
+
 sleep(0.2)
 
 midi.stop()
@@ -1,6 +1,7 @@
 from __future__ import annotations
 import threading
 import time
+from abc import ABC, abstractmethod
 import mido
 from mido import Message 
 from mido.ports import BasePort
@@ -9,42 +10,97 @@ from midi.connections import MessageDestination, MessageSource
 import logging
 import queue
 from multiprocessing import Queue
+from concurrent.futures import ThreadPoolExecutor
+from sortedcontainers import SortedList
 
 
 class PortManager():
     def __init__(self, config):
         self.in_ports = {}
         self.out_ports = {}
+        self._port_names = {p['name'].lower(): p['port_name'] for p in config['ports']}
+        self._lock = threading.Lock()
 
-        for p in config['ports']:
-            logging.warning(f"PortManager():__init__ {p['port_name']} opening.")
-            in_port = self._find_in_port(p['port_name'])
+        self._discover()
 
-            name = p['name'].lower()
-            if in_port:
-                self.in_ports[name] = InPort(in_port, name)
-            else:
-                logging.warning(f"PortManager():__init__ {p['port_name']} in port not found.  Ignoring.")
+    def register_midi_queue(self, midi_queue: Midi):
+        self._midi_queue = midi_queue
 
-            out_port = self._find_out_port(p['port_name'])
+    def _discover(self):
+        self._in_names = SortedList(mido.get_input_names())
+        self._out_names = SortedList(mido.get_output_names())
 
-            if out_port:
-                self.out_ports[name] = OutPort(out_port, name)
-            else:
-                logging.warning(f"PortManager():__init__ {p['port_name']} out port not found.  Ignoring.")
+    def _resolve(self, available: SortedList, port_name: str):
+        i = available.bisect_left(port_name)
 
-    def register_midi_queue(self, midi_queue: Midi):
-        self._midi_queue = midi_queue
+        if i < len(available) and available[i].startswith(port_name):
+            return available[i]
+
+    def open_ports(self, in_names, out_names):
+        start = time.monotonic_ns()
+
+        with self._lock:
+            wanted = self._add_ports(self.in_ports, InPort, in_names) + self._add_ports(self.out_ports, OutPort, out_names)
+
+            with ThreadPoolExecutor() as executor:
+                connected = list(executor.map(self._connect, wanted))
+
+        for port, ok in zip(wanted, connected):
+            if not ok:
+                logging.warning(f"PortManager():open_ports {port.port_name} {port.direction} port not found.  Waiting for it.")
+
+        logging.warning(f"PortManager():open_ports {sum(connected)}/{len(wanted)} ports opened in {(time.monotonic_ns() - start) / 1_000_000:.1f}ms.")
+
+    def _add_ports(self, ports: dict, port_class, names):
+        result = []
+
+        for n in {n.lower() for n in names}:
+            if n not in self._port_names:
+                logging.warning(f"PortManager():open_ports {n} not in config.  Ignoring.")
+            elif n not in ports:
+                ports[n] = port_class(n, self._port_names[n])
+                result.append(ports[n])
+
+        return result
+
+    def _available(self, port: Port) -> SortedList:
+        return self._in_names if isinstance(port, InPort) else self._out_names
 
-    def _find_in_port(self, port_name: str):
-        for port_name_actual in mido.get_input_names():
-            if port_name_actual.startswith(port_name):
-                return mido.open_input(port_name_actual)
+    def _connect(self, port: Port) -> bool:
+        port_name_actual = self._resolve(self._available(port), port.port_name)
 
-    def _find_out_port(self, port_name: str):
-        for port_name_actual in mido.get_output_names():
-            if port_name_actual.startswith(port_name):
-                return mido.open_output(port_name_actual)
+        if not port_name_actual:
+            return False
+
+        start = time.monotonic_ns()
+
+        try:
+            port.attach(port_name_actual)
+        except Exception as e:
+            logging.warning(f"PortManager():_connect {port_name_actual} failed to open: {e}")
+            return False
+
+        elapsed = time.monotonic_ns() - start
+        message = f"PortManager():_connect {port.name} {port.direction} opened {port_name_actual} in {elapsed / 1_000_000:.1f}ms"
+
+        if port.disconnected_at:
+            message += f" after {(start - port.disconnected_at) / 1_000_000_000:.1f}s offline"
+            port.disconnected_at = None
+
+        logging.warning(f"{message}.")
+        return True
+
+    def refresh(self):
+        with self._lock:
+            self._discover()
+
+            for port in [*self.in_ports.values(), *self.out_ports.values()]:
+                if port.connected() and port.port.name not in self._available(port):
+                    logging.warning(f"PortManager():refresh {port.name} {port.direction} disconnected.")
+                    port.detach()
+
+                if not port.connected():
+                    self._connect(port)
 
     def get_in_channel(self, port_name: str, channel: int):
         if port_name.lower() in self.in_ports:
@@ -55,10 +111,29 @@ class PortManager():
             return OutChannel(port_name.lower(), self._midi_queue)
 
     def debug_ports(self):
-        for port_name_actual in mido.get_output_names():
+        for port_name_actual in self._out_names:
             logging.warning(port_name_actual)
 
 
+class PortMonitor(threading.Thread):
+    def __init__(self, port_manager: PortManager, interval: float = 1.0):
+        super().__init__()
+
+        self._port_manager = port_manager
+        self._interval = interval
+        self._done = threading.Event()
+
+    def run(self):
+        while not self._done.wait(self._interval):
+            try:
+                self._port_manager.refresh()
+            except Exception as e: # A half unplugged device must not stop later reconnections
+                logging.warning(f'PortMonitor():run refresh failed: {e}')
+
+    def stop(self):
+        self._done.set()
+
+
 class Midi(threading.Thread):
     def __init__(self, port_manager: PortManager):
         super().__init__()
@@ -79,8 +154,10 @@ class Midi(threading.Thread):
         while True:
             try:
                 message, port_name = self.queue.get_nowait()
-                port = self._port_manager.out_ports[port_name]
-                port.port.send(message)
+                port = self._port_manager.out_ports.get(port_name)
+
+                if port:
+                    port.send(message)
             except queue.Empty:
                 break
 
@@ -92,7 +169,7 @@ class Midi(threading.Thread):
     def stop(self):
         logging.warning('Stoppings......')
         for name, op in self._port_manager.out_ports.items():
-            op.port.reset()
+            op.reset()
 
         self._done = True
 
@@ -123,16 +200,47 @@ class OutChannel(MessageDestination):
         self._midi_queue.queue_message(self.port_name, message)
 
 
-class InPort():
-    def __init__(self, port: BasePort, name: str):
-        self.port = port
+class Port(ABC):
+    direction = ''
+
+    def __init__(self, name: str, port_name: str):
+        self.port: BasePort = None
         self.name = name
+        self.port_name = port_name
+        self.disconnected_at = None
+
+    def connected(self) -> bool:
+        return self.port is not None
+
+    def attach(self, port_name_actual: str):
+        self.port = self._open(port_name_actual)
+
+    def detach(self):
+        port, self.port = self.port, None
+        self.disconnected_at = time.monotonic_ns()
+
+        try:
+            port.close()
+        except Exception as e:
+            logging.warning(f'Port():detach {self.name} failed to close: {e}')
+
+    @abstractmethod
+    def _open(self, port_name_actual: str) -> BasePort:
+        pass
+
+
+class InPort(Port):
+    direction = 'in'
+
+    def __init__(self, name: str, port_name: str):
+        super().__init__(name, port_name)
         self.channels = []
 
         for i in range(16):
             self.channels.append(InChannel())
-        
-        port.callback = self.on_port_callback
+
+    def _open(self, port_name_actual: str) -> BasePort:
+        return mido.open_input(port_name_actual, callback=self.on_port_callback)
 
     def on_port_callback(self, message: Message):
         if hasattr(message, 'channel'): # Not all messages have channels
@@ -140,7 +248,26 @@ class InPort():
             self.channels[message.channel].send_message(message)
 
 
-class OutPort():
-    def __init__(self, port: BasePort, name: str):
-        self.port = port
-        self.name = name
+class OutPort(Port):
+    direction = 'out'
+
+    def _open(self, port_name_actual: str) -> BasePort:
+        return mido.open_output(port_name_actual)
+
+    def send(self, message: Message):
+        port = self.port
+
+        if port:
+            try:
+                port.send(message)
+            except Exception as e: # The device may vanish between monitor polls
+                logging.warning(f'OutPort():send {self.name} failed: {e}')
+
+    def reset(self):
+        port = self.port
+
+        if port:
+            try:
+                port.reset()
+            except Exception as e: # The device may vanish between monitor polls
+                logging.warning(f'OutPort():reset {self.name} failed: {e}')
@@ -0,0 +1,156 @@
+from __future__ import annotations
+import logging
+import queue
+import threading
+from collections import deque
+from random import Random
+from typing import Any, Callable
+
+
+class TuringMachine:
+    DAC_BITS = 8
+
+    def __init__(self, config: dict, rng: Random):
+        self.length: int = config.get('length', 16)
+        self.mutate: float = min(max(config.get('mutate', 0.1), 0.0), 1.0)
+        self.locked: bool = config.get('locked', False)
+        self._rng = rng
+
+        if isinstance(self.length, bool) or not isinstance(self.length, int) or self.length < 1:
+            raise ValueError(f'Turing machine length {self.length!r} must be a whole number of 1 or more')
+
+        self._mask = (1 << self.length) - 1
+        self._dac_mask = (1 << min(self.length, TuringMachine.DAC_BITS)) - 1
+        self.register = 0
+
+    def reset(self):
+        self.register = self._rng.getrandbits(self.length)
+
+    def lock(self):
+        self.locked = True
+
+    def unlock(self):
+        self.locked = False
+
+    def toggle_lock(self) -> bool:
+        self.locked = not self.locked
+        return self.locked
+
+    def step(self) -> float:
+        bit = (self.register >> (self.length - 1)) & 1
+
+        # Always draw, so locking and unlocking does not shift the random stream
+        if self._rng.random() < self.mutate and not self.locked:
+            bit ^= 1
+
+        self.register = ((self.register << 1) & self._mask) | bit
+
+        return (self.register & self._dac_mask) / self._dac_mask
+
+
+class LoopBuffer:
+    AHEAD = 2
+
+    def __init__(
+        self,
+        compile_loop: Callable[[int], list],
+        reseed: Callable[[], None],
+        snapshot: Callable[[], Any],
+        restore: Callable[[Any], None],
+    ) -> None:
+        self._compile_loop = compile_loop
+        self._reseed = reseed
+        self._snapshot = snapshot
+        self._restore = restore
+        # _lock serialises compiling, _swap_lock is only held briefly so the tick thread never waits on a compile
+        self._lock = threading.Lock()
+        self._swap_lock = threading.Lock()
+        self._loops: deque[tuple[int, Any, list]] = deque()
+        self._next_loop = 0
+        self._current = []
+
+        self.reset()
+
+    def _compile(self) -> tuple[int, Any, list]:
+        loop, state = self._next_loop, self._snapshot()
+        self._next_loop += 1
+
+        return loop, state, self._compile_loop(loop)
+
+    def _fill(self):
+        while len(self._loops) < LoopBuffer.AHEAD:
+            compiled = self._compile()
+
+            with self._swap_lock:
+                self._loops.append(compiled)
+
+    def fill(self):
+        with self._lock:
+            self._fill()
+
+    def reset(self):
+        with self._lock:
+            with self._swap_lock:
+                self._loops.clear()
+
+            self._next_loop = 0
+            self._reseed()
+            self._fill()
+
+    def invalidate(self):
+        with self._lock:
+            with self._swap_lock:
+                pending = list(self._loops)
+
+            if not pending:
+                return
+
+            # Recompile the loops not yet played from the state they were first compiled from
+            loop, state, _ = pending[0]
+            self._next_loop = loop
+            self._restore(state)
+
+            fresh = [self._compile() for _ in pending]
+
+            with self._swap_lock:
+                # The tick thread may have taken loops while recompiling, those have been played already
+                played = len(pending) - len(self._loops)
+                self._loops.clear()
+                self._loops.extend(fresh[played:])
+
+            self._fill()
+
+    def next(self) -> list:
+        with self._swap_lock:
+            if self._loops:
+                _, _, self._current = self._loops.popleft()
+            else:
+                logging.warning('LoopBuffer():next generator fell behind.  Repeating last loop.')
+
+        return self._current
+
+
+class Generator(threading.Thread):
+    def __init__(self):
+        super().__init__()
+
+        self._requests = queue.Queue()
+
+    def request(self, buffer: LoopBuffer):
+        self._requests.put(buffer)
+
+    def run(self):
+        while True:
+            buffer = self._requests.get()
+
+            if buffer is None:
+                break
+
+            # One failing pattern must not stop the generator for every other pattern
+            try:
+                buffer.fill()
+            except Exception as e:
+                logging.warning(f'Generator():run failed to fill buffer: {e!r}')
+
+    def stop(self):
+        self._requests.put(None)
@@ -3,6 +3,7 @@ from midi.clock import Clock
 from midi.sequencing import Instrument, Part
 from midi.clock import MidiClockSender
 from midi.connectors import PortManager, Midi
+from midi.generators import Generator
 
 
 class Project:
@@ -13,9 +14,12 @@ class Project:
         self._connectors = []
         self._instruments = {}
         self._parts = {}
+        self._seed = project_data.get('seed', 0)
+        self._generator = Generator()
 
         self._clock = Clock(bpm=project_data['bpm'])
 
+        self._open_ports()
         self._register_connectors()
         self._register_instruments()
         self._register_parts()
@@ -24,7 +28,41 @@ class Project:
     
     def get_instrument(self, name: str) -> Instrument:
         return self._instruments.get(name, None)
+
+    def get_turing_machines(self) -> list[tuple[str, str]]:
+        return [(p.name, t) for p in self._parts.values() for t in p.turing_patterns]
+
+    def toggle_turing_lock(self, part_name: str, timbre_name: str) -> bool:
+        return self._parts[part_name].toggle_turing_lock(timbre_name)
+
+    def set_turing_mutate(self, part_name: str, timbre_name: str, mutate: float):
+        self._parts[part_name].set_turing_mutate(timbre_name, mutate)
+
+    def get_turing_mutate(self, part_name: str, timbre_name: str) -> float:
+        return self._parts[part_name].get_turing_mutate(timbre_name)
+
+    def get_generator(self) -> Generator:
+        return self._generator
+
+    def get_seed(self, name: str) -> str:
+        return f'{self._seed}:{name}'
     
+    def _open_ports(self):
+        in_names = set()
+        out_names = set()
+
+        for c in self._project_data.get('connectors', []):
+            in_names.add(c['in_port_name'])
+            out_names.add(c['out_port_name'])
+
+        for i in self._project_data.get('instruments', []):
+            out_names.add(i['port'])
+
+        for c in self._project_data.get('clock_outputs', []):
+            out_names.add(c['out_port_name'])
+
+        self._port_manager.open_ports(in_names, out_names)
+
     def _register_connectors(self):
         if 'connectors' not in self._project_data:
             return
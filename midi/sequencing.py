@@ -1,11 +1,15 @@
 from __future__ import annotations
+import logging
 from dataclasses import dataclass
 from mido import Message
 from midi.clock import Clock, ClockWatcher
 from midi.connections import MessageSource
 from sortedcontainers import SortedList
 from midi.connectors import PortManager
+from midi.generators import Generator, LoopBuffer, TuringMachine
+from midi.scales import Scale
 from copy import deepcopy
+from random import Random
 from typing import Self
 from midi.connectors import PortManager
 
@@ -18,6 +22,14 @@ class Note():
     tick_off: int
 
 
+@dataclass
+class Step():
+    note: int
+    channel: int
+    velocity: int
+    gate: int
+
+
 class Instrument:
     def __init__(self, config: dict, port_manager: PortManager):
         super().__init__()
@@ -39,11 +51,55 @@ class SymbolMapping:
         self.velocity = config.get('velocity', df_velocity)
         self.note = config.get('note', df_note)
         self.channel = config.get('channel', df_channel)
+        self.chance = self._parse_chance(config.get('chance', None))
+        self.condition = self._parse_condition(config.get('condition', None))
+        self.velocity_spread = self._parse_spread('velocity_spread', config.get('velocity_spread', None))
+        self.gate = config.get('gate', None)
+        self.gate_spread = self._parse_spread('gate_spread', config.get('gate_spread', None))
+        self.octave_spread = self._parse_spread('octave_spread', config.get('octave_spread', None))
+
+    def _parse_chance(self, chance) -> float:
+        if chance is None:
+            return None
+
+        if isinstance(chance, bool) or not isinstance(chance, (int, float)) or not 0 <= chance <= 1:
+            raise ValueError(f"Symbol '{self.symbol}' chance {chance!r} must be a number from 0 to 1")
+
+        return chance
+
+    def _parse_spread(self, name: str, spread) -> int:
+        if spread is None:
+            return None
+
+        if isinstance(spread, bool) or not isinstance(spread, int) or spread < 0:
+            raise ValueError(f"Symbol '{self.symbol}' {name} {spread!r} must be a whole number of 0 or more")
+
+        return spread
+
+    def _parse_condition(self, condition) -> tuple[int, int]:
+        if condition is None:
+            return None
+
+        try:
+            play, every = (int(x) for x in condition.split(':'))
+        except (AttributeError, ValueError):
+            play, every = 0, 0
+
+        if not 1 <= play <= every:
+            raise ValueError(f"Symbol '{self.symbol}' condition {condition!r} must be a quoted 'A:B' string with 1 <= A <= B, e.g. condition: '1:2'")
+
+        return play, every
 
     def apply_defaults(self, defaults: Self):
         self.velocity = self.velocity or defaults.velocity
         self.note = self.note or defaults.note
         self.channel = self.channel or defaults.channel
+        self.chance = defaults.chance if self.chance is None else self.chance
+        self.condition = defaults.condition if self.condition is None else self.condition
+        self.velocity_spread = defaults.velocity_spread if self.velocity_spread is None else self.velocity_spread
+        self.gate = defaults.gate if self.gate is None else self.gate
+        self.gate_spread = defaults.gate_spread if self.gate_spread is None else self.gate_spread
+        self.octave_spread = defaults.octave_spread if self.octave_spread is None else self.octave_spread
 
     def apply_default_values(self, df_channel: int, df_note: int, df_velocity: int):
         self.velocity = self.velocity or df_velocity
@@ -90,34 +146,135 @@ class Timbre:
 
 
 class SymbolPattern:
-    def __init__(self, pattern: str, symbol_mapper: SymbolMapper, timing: Timing) -> None:
+    def __init__(
+        self,
+        pattern: str,
+        symbol_mapper: SymbolMapper,
+        timing: Timing,
+        seed: str,
+        generator: Generator,
+        loops: int = 1,
+        scale: Scale = None,
+        turing_machine: dict = None,
+    ) -> None:
         self.timing = timing
         self.pattern = pattern.split()
         self.symbol_mapper = symbol_mapper
+        self.loops = loops
+        self.scale = scale
         self.last_beat = 0
 
+        self._seed = seed
+        self._rng = Random()
+        self.turing_machine = TuringMachine(turing_machine, self._rng) if turing_machine is not None else None
+
+        self._generator = generator
+        self._steps: list[list[Step]] = []
+        self._buffer = LoopBuffer(self._compile_loop, self._reseed, self._snapshot, self._restore)
+
+    def _reseed(self):
+        self._rng.seed(self._seed)
+
+        if self.turing_machine:
+            self.turing_machine.reset()
+
+    def _snapshot(self):
+        return self._rng.getstate(), self.turing_machine.register if self.turing_machine else None
+
+    def _restore(self, state):
+        rng_state, register = state
+        self._rng.setstate(rng_state)
+
+        if self.turing_machine:
+            self.turing_machine.register = register
+
+    def toggle_turing_lock(self) -> bool:
+        locked = self.turing_machine.toggle_lock()
+        self._buffer.invalidate()
+        return locked
+
+    def set_turing_mutate(self, mutate: float):
+        self.turing_machine.mutate = min(max(mutate, 0.0), 1.0)
+        self._buffer.invalidate()
+
+    def _compile_loop(self, loop: int) -> list[list[Step]]:
+        return [self._compile_step(self.symbol_mapper.map[symbol], loop) for symbol in self.pattern]
+
+    def _compile_step(self, m: SymbolMapping, loop: int) -> list[Step]:
+        note = m.note
+
+        if self.turing_machine:
+            lowest, highest = self.scale.get_notes()[0], self.scale.get_notes()[-1]
+            note = lowest + round(self.turing_machine.step() * (highest - lowest))
+
+        if not m.velocity:
+            return []
+
+        if m.condition:
+            play, every = m.condition
+
+            if loop % every != play - 1:
+                return []
+
+        if m.chance is not None and self._rng.random() >= m.chance:
+            return []
+
+        return [Step(
+            note=self._quantize(note + 12 * self._spread(m.octave_spread)),
+            velocity=min(max(m.velocity + self._spread(m.velocity_spread), 1), 127),
+            channel=m.channel,
+            gate=max((m.gate or 1) + self._spread(m.gate_spread), 1),
+        )]
+
+    def _spread(self, spread: int) -> int:
+        return self._rng.randint(-spread, spread) if spread else 0
+
+    def _quantize(self, note: int) -> int:
+        if not self.scale:
+            return min(max(note, 0), 127)
+
+        lowest, highest = self.scale.get_notes()[0], self.scale.get_notes()[-1]
+
+        # Fold by octaves so out of range notes keep their pitch class rather than piling up on the edges
+        while note < lowest:
+            note += 12
+
+        while note > highest:
+            note -= 12
+
+        return self.scale.quantize_note(min(max(note, lowest), highest))
+
     def get_notes(self, tick) -> list[Note]:
         result: list[Note] = []
 
         beat = self.timing.get_beat(tick)
 
-        if beat:
+        if beat is not None:
             self.last_beat = beat
-            symbol = self.pattern[beat]
-            m: SymbolMapper = self.symbol_mapper.map[symbol]
+            step = beat % len(self.pattern)
+
+            # Only swap in the precomputed loop here, generating the next is left to the generator thread
+            if step == 0:
+                self._steps = self._buffer.next()
+                self._generator.request(self._buffer)
 
-            if m.velocity:
+            for s in self._steps[step]:
                 result.append(Note(
-                    note=m.note,
-                    velocity=m.velocity,
-                    channel=m.channel,
-                    tick_off=self.timing.get_next_tick_for_length(tick, 1),
+                    note=s.note,
+                    velocity=s.velocity,
+                    channel=s.channel,
+                    tick_off=self.timing.get_next_tick_for_length(tick, s.gate),
                 ))
         
         return result
     
     def done(self):
-        return self.last_beat >= (len(self.pattern) - 1)
+        return bool(self.loops) and self.last_beat >= (len(self.pattern) * self.loops - 1)
+
+    def reset(self):
+        self.last_beat = 0
+        self._steps = []
+        self._buffer.reset()
 
 
 class Timing:
@@ -143,6 +300,16 @@ class Part:
         self.instrument_name: str = config.get('instrument', None)
         self.instrument: Instrument = project.get_instrument(self.instrument_name)
         self.timing: Timing = Timing(config)
+        self.loops: int = config.get('loops', 1)
+        self.scale: Scale = None
+
+        if 'key' in config or 'scale' in config or 'turing_machines' in config:
+            self.scale = Scale(
+                key=config.get('key', 'c'),
+                scale=config.get('scale', 'major'),
+                lowest_note=config.get('lowest_note', 48),
+                highest_note=config.get('highest_note', 72),
+            )
 
         self.symbol_mapper = SymbolMapper(
             config=config.get('symbols', []),
@@ -154,14 +321,38 @@ class Part:
         self.symbol_mapper.apply_defaults(self.instrument.default_symbol_mapper)
 
         self.patterns = []
+        self.turing_patterns: dict[str, SymbolPattern] = {}
+        turing_machines = config.get('turing_machines', {})
 
         for timbre_name, pattern in config.get('patterns', {}).items():
+            if not (pattern or '').split():
+                logging.warning(f"Part():__init__ {self.name} pattern for {timbre_name} is empty.  Ignoring.")
+                continue
+
             timbre_mapper: Timbre = self.instrument.timbres[timbre_name]
-            self.patterns.append(SymbolPattern(
+            symbol_pattern = SymbolPattern(
                 pattern=pattern,
                 symbol_mapper=timbre_mapper.symbol_mapper,
                 timing=self.timing,
-            ))
+                seed=project.get_seed(f'{self.name}:{timbre_name}'),
+                generator=project.get_generator(),
+                loops=self.loops,
+                scale=self.scale,
+                turing_machine=turing_machines.get(timbre_name, None),
+            )
+            self.patterns.append(symbol_pattern)
+
+            if symbol_pattern.turing_machine:
+                self.turing_patterns[timbre_name] = symbol_pattern
+
+    def toggle_turing_lock(self, timbre_name: str) -> bool:
+        return self.turing_patterns[timbre_name].toggle_turing_lock()
+
+    def set_turing_mutate(self, timbre_name: str, mutate: float):
+        self.turing_patterns[timbre_name].set_turing_mutate(mutate)
+
+    def get_turing_mutate(self, timbre_name: str) -> float:
+        return self.turing_patterns[timbre_name].turing_machine.mutate
     
     def register_clock(self, clock: Clock):
         players: dict[Player] = []
@@ -208,4 +399,5 @@ class Player(ClockWatcher, MessageSource):
         return all([p.done() for p in self._patterns])
 
     def restart(self):
-        pass
+        for p in self._patterns:
+            p.reset()
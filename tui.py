@@ -6,7 +6,7 @@ from textual.widgets import ScrollView
 import logging
 import yaml
 
-from midi.connectors import Midi, PortManager
+from midi.connectors import Midi, PortManager, PortMonitor
 from midi.project import Project
 
 traceback.install()
@@ -33,11 +33,17 @@ class BlueApp(App):
     async def on_load(self, event):
         await self.bind("q", "quit")
         await self.bind("s", "toggle")
+        await self.bind("l", "turing_lock")
+        await self.bind("m", "turing_mutate(0.05)")
+        await self.bind("n", "turing_mutate(-0.05)")
         self.port_manager = PortManager(config)
         self.midi = Midi(self.port_manager)
         self.project = Project(project, self.port_manager, self.midi)
+        self.port_monitor = PortMonitor(self.port_manager)
 
         self.midi.start()
+        self.port_monitor.start()
+        self.project._generator.start()
         self.project._clock.start()
 
     async def on_mount(self):
@@ -51,12 +57,27 @@ class BlueApp(App):
         await super().shutdown()
         self.project._clock.stop()
         self.project._clock.join()
+        self.port_monitor.stop()
+        self.port_monitor.join()
+        self.project._generator.stop()
+        self.project._generator.join()
         self.midi.stop()
         self.midi.join()
 
     async def action_toggle(self):
         self.project._clock.toggle()
 
+    async def action_turing_lock(self):
+        for part_name, timbre_name in self.project.get_turing_machines():
+            locked = self.project.toggle_turing_lock(part_name, timbre_name)
+            self._display.log = f'{part_name} {timbre_name} {"locked" if locked else "unlocked"}'
+
+    async def action_turing_mutate(self, change: float):
+        for part_name, timbre_name in self.project.get_turing_machines():
+            mutate = self.project.get_turing_mutate(part_name, timbre_name) + change
+            self.project.set_turing_mutate(part_name, timbre_name, mutate)
+            self._display.log = f'{part_name} {timbre_name} mutate {self.project.get_turing_mutate(part_name, timbre_name):.2f}'
+
     async def tick(self):
         self._display.position_description = self.project.position_description()
         self._display.refresh()